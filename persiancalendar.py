@@ -65,6 +65,20 @@ def sign(y):
         return 0
 
 
+def invert_angular(f, y, a, b):
+    """Use bisection to find inverse of angular function f at y
+    within interval [a, b]."""
+    varepsilon = 1 / 100000  # Desired accuracy
+    lo, hi = a, b
+    while hi - lo >= varepsilon:
+        x = (lo + hi) / 2
+        if (f(x) - y) % 360 < 180:
+            hi = x
+        else:
+            lo = x
+    return (lo + hi) / 2
+
+
 # Fixed date of start of the (proleptic) Gregorian calendar.
 GREGORIAN_EPOCH = rd(1)
 
@@ -330,6 +344,40 @@ def equation_of_time(tee):
     return sign(equation) * min(abs(equation), hr(12))
 
 
+# Coefficients, addends and multipliers (in decreasing order of
+# coefficient) of the periodic terms of the solar longitude.
+SOLAR_LONGITUDE_COEFFICIENTS = (403406, 195207, 119433, 112392, 3891, 2819, 1721,
+                                660, 350, 334, 314, 268, 242, 234, 158, 132, 129, 114,
+                                99, 93, 86, 78, 72, 68, 64, 46, 38, 37, 32, 29, 28, 27, 27,
+                                25, 24, 21, 21, 20, 18, 17, 14, 13, 13, 13, 12, 10, 10, 10,
+                                10)
+SOLAR_LONGITUDE_MULTIPLIERS = (0.9287892, 35999.1376958, 35999.4089666,
+                               35998.7287385, 71998.20261, 71998.4403,
+                               36000.35726, 71997.4812, 32964.4678,
+                               -19.4410, 445267.1117, 45036.8840, 3.1008,
+                               22518.4434, -19.9739, 65928.9345,
+                               9038.0293, 3034.7684, 33718.148, 3034.448,
+                               -2280.773, 29929.992, 31556.493, 149.588,
+                               9037.750, 107997.405, -4444.176, 151.771,
+                               67555.316, 31556.080, -4561.540,
+                               107996.706, 1221.655, 62894.167,
+                               31437.369, 14578.298, -31931.757,
+                               34777.243, 1221.999, 62894.511,
+                               -4442.039, 107997.909, 119.066, 16859.071,
+                               -4.578, 26895.292, -39.127, 12297.536,
+                               90073.778)
+SOLAR_LONGITUDE_ADDENDS = (270.54861, 340.19128, 63.91854, 331.26220,
+                           317.843, 86.631, 240.052, 310.26, 247.23,
+                           260.87, 297.82, 343.14, 166.79, 81.53,
+                           3.50, 132.75, 182.95, 162.03, 29.8,
+                           266.4, 249.2, 157.6, 257.8, 185.1, 69.9,
+                           8.0, 197.1, 250.4, 65.3, 162.7, 341.5,
+                           291.6, 98.5, 146.7, 110.0, 5.2, 342.6,
+                           230.9, 256.1, 45.3, 242.9, 115.2, 151.8,
+                           285.3, 53.3, 126.6, 205.7, 85.9,
+                           146.1)
+
+
 def solar_longitude(tee):
     """Longitude of sun at moment tee.
 
@@ -338,39 +386,9 @@ def solar_longitude(tee):
     Willmann-Bell, 1986."""
 
     c = julian_centuries(tee)  # moment in Julian centuries
-    coefficients = (403406, 195207, 119433, 112392, 3891, 2819, 1721,
-                    660, 350, 334, 314, 268, 242, 234, 158, 132, 129, 114,
-                    99, 93, 86, 78, 72, 68, 64, 46, 38, 37, 32, 29, 28, 27, 27,
-                    25, 24, 21, 21, 20, 18, 17, 14, 13, 13, 13, 12, 10, 10, 10,
-                    10)
-    multipliers = (0.9287892, 35999.1376958, 35999.4089666,
-                   35998.7287385, 71998.20261, 71998.4403,
-                   36000.35726, 71997.4812, 32964.4678,
-                   -19.4410, 445267.1117, 45036.8840, 3.1008,
-                   22518.4434, -19.9739, 65928.9345,
-                   9038.0293, 3034.7684, 33718.148, 3034.448,
-                   -2280.773, 29929.992, 31556.493, 149.588,
-                   9037.750, 107997.405, -4444.176, 151.771,
-                   67555.316, 31556.080, -4561.540,
-                   107996.706, 1221.655, 62894.167,
-                   31437.369, 14578.298, -31931.757,
-                   34777.243, 1221.999, 62894.511,
-                   -4442.039, 107997.909, 119.066, 16859.071,
-                   -4.578, 26895.292, -39.127, 12297.536,
-                   90073.778)
-    addends = (270.54861, 340.19128, 63.91854, 331.26220,
-               317.843, 86.631, 240.052, 310.26, 247.23,
-               260.87, 297.82, 343.14, 166.79, 81.53,
-               3.50, 132.75, 182.95, 162.03, 29.8,
-               266.4, 249.2, 157.6, 257.8, 185.1, 69.9,
-               8.0, 197.1, 250.4, 65.3, 162.7, 341.5,
-               291.6, 98.5, 146.7, 110.0, 5.2, 342.6,
-               230.9, 256.1, 45.3, 242.9, 115.2, 151.8,
-               285.3, 53.3, 126.6, 205.7, 85.9,
-               146.1)
-    x = coefficients
-    y = addends
-    z = multipliers
+    x = SOLAR_LONGITUDE_COEFFICIENTS
+    y = SOLAR_LONGITUDE_ADDENDS
+    z = SOLAR_LONGITUDE_MULTIPLIERS
     lamda = (
         282.7771834
         + 36000.76953744 * c
@@ -394,6 +412,57 @@ def aberration(tee):
     return 0.0000974 * cos_degrees(177.63 + 35999.01848 * c) - 0.005575
 
 
+# Number of periodic terms (the largest ones) summed by
+# solar_longitude_estimate.
+SOLAR_LONGITUDE_ESTIMATE_TERMS = 8
+
+# Upper bound (in degrees) of the difference between solar_longitude_estimate
+# and solar_longitude: the omitted periodic terms, the largest possible
+# nutation, the periodic part of aberration, and a margin for rounding.
+SOLAR_LONGITUDE_ESTIMATE_ERROR = (
+    0.000005729577951308232 *
+    sum(SOLAR_LONGITUDE_COEFFICIENTS[SOLAR_LONGITUDE_ESTIMATE_TERMS:])
+    + 0.004778 + 0.0003667  # Nutation
+    + 0.0000974  # Aberration
+    + 0.000001)
+
+
+def solar_longitude_estimate(tee):
+    """Longitude of sun at moment tee, within
+    SOLAR_LONGITUDE_ESTIMATE_ERROR degrees.
+
+    Like solar_longitude, but only sums the largest periodic terms
+    and uses the mean aberration and no nutation."""
+
+    c = julian_centuries(tee)  # moment in Julian centuries
+    x = SOLAR_LONGITUDE_COEFFICIENTS
+    y = SOLAR_LONGITUDE_ADDENDS
+    z = SOLAR_LONGITUDE_MULTIPLIERS
+    lamda = (
+        282.7771834
+        + 36000.76953744 * c
+        + 0.000005729577951308232 *
+        sum([x[i] * sin_degrees(y[i] + z[i] * c)
+             for i in range(SOLAR_LONGITUDE_ESTIMATE_TERMS)])
+    )
+    return (lamda - 0.005575) % 360
+
+
+def solar_longitude_for_comparison(tee, boundaries):
+    """Longitude of sun at moment tee, precise enough to compare with
+    each of the longitudes in boundaries.
+
+    Returns solar_longitude_estimate, unless that is within
+    SOLAR_LONGITUDE_ESTIMATE_ERROR of one of boundaries or of 0 (where the
+    longitude wraps around), in which case returns solar_longitude."""
+
+    lamda = solar_longitude_estimate(tee)
+    for boundary in (0,) + tuple(boundaries):
+        if abs(mod3(lamda - boundary, -180, 180)) <= SOLAR_LONGITUDE_ESTIMATE_ERROR:
+            return solar_longitude(tee)
+    return lamda
+
+
 # Longitude of sun at vernal equinox.
 SPRING = 0
 
@@ -403,11 +472,22 @@ def estimate_prior_solar_longitude(lamda, tee):
     when solar longitude just exceeded lamda degrees."""
     rate = MEAN_TROPICAL_YEAR / 360  # Mean change of one degree.
     # First approximation.
-    tau = tee - rate * ((solar_longitude(tee) - lamda) % 360)
-    cap_delta = mod3(solar_longitude(tau) - lamda, -180, 180)
+    tau = tee - rate * ((solar_longitude_for_comparison(tee, (lamda,)) - lamda) % 360)
+    cap_delta = mod3(solar_longitude_for_comparison(tau, (lamda,)) - lamda, -180, 180)
     return min(tee, tau - rate * cap_delta)
 
 
+def solar_longitude_after(lamda, tee):
+    """Moment UT of the first time at or after tee
+    when the solar longitude will be lamda degrees."""
+    rate = MEAN_TROPICAL_YEAR / 360  # Mean days for 1 degree change.
+    # Estimate (within 5 days).
+    tau = tee + rate * ((lamda - solar_longitude(tee)) % 360)
+    a = max(tee, tau - 5)  # At or after tee.
+    b = tau + 5
+    return invert_angular(solar_longitude, lamda, a, b)
+
+
 # Fixed date of start of the Persian calendar.
 PERSIAN_EPOCH = fixed_from_julian((622, 3, 19))
 
@@ -443,7 +523,7 @@ def persian_new_year_on_or_before(date):
     approx = estimate_prior_solar_longitude(
         SPRING, midday_in_persian_locale(date))
     day = math.floor(approx) - 1
-    while solar_longitude(midday_in_persian_locale(day)) > SPRING + 2:
+    while solar_longitude_for_comparison(midday_in_persian_locale(day), (SPRING + 2,)) > SPRING + 2:
         day += 1
     return day
 
@@ -455,18 +535,29 @@ def persian_borji_new_month_on_or_before(date, month):
     approx = estimate_prior_solar_longitude(
         target_long, midday_in_persian_locale(date))
     day = math.floor(approx) - 1
-    while not (target_long + 2 > solar_longitude(midday_in_persian_locale(day)) >= target_long):
+    while not (target_long + 2
+               > solar_longitude_for_comparison(midday_in_persian_locale(day), (target_long, target_long + 2))
+               >= target_long):
         day += 1
     return day
 
 
-def fixed_from_persian(p_date):
-    """Fixed date of Astronomical Persian date p_date."""
+def fixed_from_persian(p_date, new_years=None):
+    """Fixed date of Astronomical Persian date p_date.
+
+    new_years, if given, is a dictionary mapping Persian years to the fixed
+    dates of their New Year. It is used, and updated, to avoid recomputing
+    them."""
     year, month, day = p_date
-    new_year = persian_new_year_on_or_before(
-        PERSIAN_EPOCH + 180  # Fall after epoch.
-        + math.floor(MEAN_TROPICAL_YEAR *
-                     (year - 1 if 0 < year else year)))  # No year zero.
+    if new_years is not None and year in new_years:
+        new_year = new_years[year]
+    else:
+        new_year = persian_new_year_on_or_before(
+            PERSIAN_EPOCH + 180  # Fall after epoch.
+            + math.floor(MEAN_TROPICAL_YEAR *
+                         (year - 1 if 0 < year else year)))  # No year zero.
+        if new_years is not None:
+            new_years[year] = new_year
     return (new_year - 1  # Days in prior years.
             # Days in prior months this year.
             + (31 * (month - 1) if month <= 7 else 30 * (month - 1) + 6)
@@ -485,18 +576,44 @@ def fixed_from_persian_borji(p_date):
             + day)  # Days so far this month.
 
 
-def persian_from_fixed(date):
-    """Astronomical Persian date corresponding to fixed date."""
-    new_year = persian_new_year_on_or_before(date)
-    y = round((new_year - PERSIAN_EPOCH) / MEAN_TROPICAL_YEAR) + 1
-    year = y if 0 < y else y - 1  # No year zero
-    day_of_year = date - fixed_from_persian((year, 1, 1)) + 1
+def persian_year_from_new_years(date, new_years):
+    """Astronomical Persian year corresponding to fixed date, if it can be
+    found from new_years, a dictionary mapping Persian years to the fixed
+    dates of their New Year. None otherwise."""
+    estimate = math.floor((date - PERSIAN_EPOCH) / MEAN_TROPICAL_YEAR) + 1
+    for y in (estimate - 1, estimate, estimate + 1):
+        year = y if 0 < y else y - 1  # No year zero
+        next_year = y + 1 if 0 < y + 1 else y
+        if (year in new_years and next_year in new_years
+                and new_years[year] <= date < new_years[next_year]):
+            return year
+    return None
+
+
+def persian_from_fixed(date, new_years=None):
+    """Astronomical Persian date corresponding to fixed date.
+
+    new_years, if given, is a dictionary mapping Persian years to the fixed
+    dates of their New Year. It is used, and updated, to avoid recomputing
+    them."""
+    year = None
+    if new_years is not None:
+        year = persian_year_from_new_years(date, new_years)
+    if year is None:
+        new_year = persian_new_year_on_or_before(date)
+        y = round((new_year - PERSIAN_EPOCH) / MEAN_TROPICAL_YEAR) + 1
+        year = y if 0 < y else y - 1  # No year zero
+        if new_years is not None:
+            new_years[year] = new_year
+            # So that later dates in this year are found in new_years.
+            fixed_from_persian((year + 1 if year != -1 else 1, 1, 1), new_years)
+    day_of_year = date - fixed_from_persian((year, 1, 1), new_years) + 1
     if day_of_year <= 186:
         month = math.ceil(day_of_year / 31)
     else:
         month = math.ceil((day_of_year - 6) / 30)
     # Calculate the day by subtraction
-    day = date - fixed_from_persian((year, month, 1)) + 1
+    day = date - fixed_from_persian((year, month, 1), new_years) + 1
     return (year, month, day)
 
 
@@ -527,6 +644,79 @@ def persian_leap_year(p_year):
     return next_nowruz - this_nowruz == 366
 
 
+# Half-width in days of the window searched around a warm-started estimate
+# of a solar term. Consecutive tropical years differ by minutes, so this is
+# generous.
+SOLAR_TERM_SEARCH_RADIUS = hr(2)
+
+# Moments of the solar terms already computed by persian_solar_terms,
+# keyed by Persian year.
+persian_solar_term_cache = {}
+
+
+def solar_longitude_near(lamda, tee, radius):
+    """Moment UT within radius days of tee when the solar longitude will
+    be lamda degrees. Falls back to a bisection search if the secant method
+    does not converge within that window."""
+    varepsilon = 1 / 100000  # Desired accuracy, same as invert_angular
+    rate = MEAN_TROPICAL_YEAR / 360  # Mean days for 1 degree change.
+    x0 = tee
+    f0 = mod3(solar_longitude(x0) - lamda, -180, 180)
+    x1 = x0 - rate * f0
+    for _ in range(10):
+        if abs(x1 - tee) > radius:
+            break
+        f1 = mod3(solar_longitude(x1) - lamda, -180, 180)
+        if f1 == f0:
+            break
+        x2 = x1 - f1 * (x1 - x0) / (f1 - f0)
+        if abs(x2 - x1) < varepsilon:
+            return x2
+        x0, f0, x1 = x1, f1, x2
+    return solar_longitude_after(lamda, tee - 10)
+
+
+def persian_solar_terms(start_year, end_year):
+    """Dictionary mapping each Persian year from start_year to end_year
+    (inclusive) to a tuple of the twelve moments UT when the solar longitude
+    reaches 0, 30, ..., 330 degrees, starting with the vernal equinox (tahvil-e
+    sal) beginning that year. Year 0 does not exist and is left out. The search
+    for each year is started from the moments of the year before it."""
+    terms = {}
+    previous = None
+    for year in range(start_year, end_year + 1):
+        if year == 0:  # No year zero
+            continue
+        moments = persian_solar_term_cache.get(year)
+        if moments is None:
+            if previous is None:
+                # Autumn of the year before.
+                tee = (PERSIAN_EPOCH - 180
+                       + math.floor(MEAN_TROPICAL_YEAR *
+                                    (year - 1 if 0 < year else year)))
+                moments = []
+                for month in range(1, 13):
+                    tee = solar_longitude_after((month - 1) * 30, tee)
+                    moments.append(tee)
+            else:
+                moments = [solar_longitude_near((month - 1) * 30,
+                                                previous[month - 1] + MEAN_TROPICAL_YEAR,
+                                                SOLAR_TERM_SEARCH_RADIUS)
+                           for month in range(1, 13)]
+            moments = tuple(moments)
+            persian_solar_term_cache[year] = moments
+        terms[year] = moments
+        previous = moments
+    return terms
+
+
+def persian_equinox(p_year):
+    """Moment UT of the vernal equinox (tahvil-e sal) beginning Persian year p_year."""
+    if p_year == 0:
+        raise ValueError("there is no Persian year zero")
+    return persian_solar_terms(p_year, p_year)[p_year][0]
+
+
 if __name__ == '__main__':
     import datetime
     today = datetime.date.today()
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+#
+# Copyright 2024 Roozbeh Pournader
+#
+# Licensed under the Apache License, Version 2.0 <LICENSE or
+# https://www.apache.org/licenses/LICENSE-2.0>.
+
+"""A local conversion service for the Persian calendar.
+
+The service speaks a line protocol over TCP or a Unix socket. Each request
+line is one of:
+
+    persian YYYY-MM-DD      Persian date of a Gregorian date
+    gregorian YYYY-MM-DD    Gregorian date of a Persian date
+    stats                   Throughput and latency of the service
+
+and is answered with one line, either the converted date or a line starting
+with "error:". Responses on a connection are in the order of its requests.
+
+Concurrent requests are coalesced into micro-batches. Dates in the range
+supported by persiancalendar_fast are converted right away, and the others
+are converted with the astronomical algorithm on a worker pool, so the event
+loop never blocks on them.
+"""
+
+import argparse
+import asyncio
+import collections
+import re
+import time
+
+import persiancalendar
+import persiancalendar_fast
+
+DATE_PATTERN = re.compile(r'(-?\d+)-(\d+)-(\d+)')
+
+# First and last fixed dates that persiancalendar_fast supports.
+FAST_FIRST_DATE = persiancalendar_fast.fixed_from_persian_fast(
+    (persiancalendar_fast.SUPPORTED_FIRST_YEAR, 1, 1))
+FAST_LAST_DATE = persiancalendar_fast.fixed_from_persian_fast(
+    (persiancalendar_fast.SUPPORTED_LAST_YEAR + 1, 1, 1)) - 1
+
+# Number of recent requests whose latencies are used for the statistics.
+LATENCY_WINDOW = 10000
+
+# Number of requests of one connection that may await their responses before
+# the server stops reading more from it.
+MAX_PIPELINED_REQUESTS = 1024
+
+
+def parse_date(text):
+    """(year, month, day) of a date written as YYYY-MM-DD."""
+    match = DATE_PATTERN.fullmatch(text)
+    if not match:
+        raise ValueError("malformed date: %s" % text)
+    return tuple(int(group) for group in match.groups())
+
+
+def format_date(date):
+    """YYYY-MM-DD representation of a (year, month, day) date."""
+    return "%d-%02d-%02d" % date
+
+
+def parse_request(line):
+    """(command, date) of a request line."""
+    words = line.split()
+    if len(words) != 2 or words[0] not in ('persian', 'gregorian'):
+        raise ValueError("unknown request: %s" % line)
+    command, date = words
+    date = parse_date(date)
+    year, month, day = date
+    if command == 'persian':
+        fixed_date = persiancalendar.fixed_from_gregorian(date)
+        if persiancalendar.gregorian_from_fixed(fixed_date) != date:
+            raise ValueError("invalid Gregorian date: %s" % format_date(date))
+    elif year == 0:  # No Persian year 0, unlike the proleptic Gregorian calendar
+        raise ValueError("there is no Persian year zero: %s" % format_date(date))
+    elif not (1 <= month <= 12 and 1 <= day <= (31 if month <= 6 else 30)):
+        raise ValueError("invalid Persian date: %s" % format_date(date))
+    return (command, date)
+
+
+def convert_fast(command, date):
+    """Result of a parsed request using persiancalendar_fast, or None if the
+    date is out of its supported range."""
+    year, month, day = date
+    if command == 'persian':
+        fixed_date = persiancalendar.fixed_from_gregorian(date)
+        if not FAST_FIRST_DATE <= fixed_date <= FAST_LAST_DATE:
+            return None
+        return format_date(persiancalendar_fast.persian_fast_from_fixed(fixed_date))
+    else:
+        if not (persiancalendar_fast.SUPPORTED_FIRST_YEAR
+                <= year <= persiancalendar_fast.SUPPORTED_LAST_YEAR):
+            return None
+        if month == 12 and day == 30 and not persiancalendar_fast.persian_fast_leap_year(year):
+            return "error: invalid Persian date: %s" % format_date(date)
+        fixed_date = persiancalendar_fast.fixed_from_persian_fast(date)
+        return format_date(persiancalendar.gregorian_from_fixed(fixed_date))
+
+
+def convert(command, date, new_years=None):
+    """Result of a parsed request using the astronomical algorithm.
+    new_years is passed on to persian_from_fixed and fixed_from_persian."""
+    year, month, day = date
+    if command == 'persian':
+        fixed_date = persiancalendar.fixed_from_gregorian(date)
+        return format_date(persiancalendar.persian_from_fixed(fixed_date, new_years))
+    else:
+        fixed_date = persiancalendar.fixed_from_persian(date, new_years)
+        if (month == 12 and day == 30
+                and persiancalendar.persian_from_fixed(fixed_date, new_years) != date):
+            return "error: invalid Persian date: %s" % format_date(date)
+        return format_date(persiancalendar.gregorian_from_fixed(fixed_date))
+
+
+def convert_batch(requests):
+    """Results of a list of parsed requests using the astronomical algorithm.
+    Nowruz of each Persian year is computed once for the whole batch. A
+    request that cannot be converted gets an error result of its own."""
+    new_years = {}
+    results = []
+    for command, date in requests:
+        try:
+            results.append(convert(command, date, new_years))
+        except (ValueError, ArithmeticError) as error:
+            results.append("error: %s" % error)
+    return results
+
+
+class ConversionServer:
+    """Line protocol server that converts dates in micro-batches.
+
+    A batch is dispatched when it has max_batch_size requests or when
+    max_delay seconds have passed since its first request. Astronomical
+    conversions are run on executor, or on the default executor of the event
+    loop if it is None."""
+
+    def __init__(self, max_batch_size=256, max_delay=0.002, executor=None):
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay
+        self.executor = executor
+        self.server = None
+        self.pending = None
+        self.batcher = None
+        self.start_time = None
+        self.requests = 0
+        self.batches = 0
+        self.astronomical = 0
+        self.latencies = collections.deque(maxlen=LATENCY_WINDOW)
+        self.clients = {}  # Writer of each open connection to its handler
+
+    async def start(self, path=None, host='127.0.0.1', port=0):
+        """Start listening on the Unix socket at path, or on host and port if
+        path is None."""
+        self.pending = asyncio.Queue()
+        self.batcher = asyncio.create_task(self.run_batches())
+        self.start_time = time.perf_counter()
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_client, path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    async def close(self):
+        """Stop listening, close open connections and stop dispatching
+        batches."""
+        self.server.close()
+        # Since Python 3.12, wait_closed waits for all connections to close.
+        if hasattr(self.server, 'close_clients'):
+            self.server.close_clients()
+        for writer in list(self.clients):
+            writer.close()
+        await asyncio.gather(*self.clients.values(), return_exceptions=True)
+        await self.server.wait_closed()
+        self.batcher.cancel()
+        try:
+            await self.batcher
+        except asyncio.CancelledError:
+            pass
+
+    async def request(self, line):
+        """Response line for a request line."""
+        line = line.strip()
+        if line == 'stats':
+            return self.stats()
+        try:
+            command, date = parse_request(line)
+        except ValueError as error:
+            return "error: %s" % error
+        future = asyncio.get_running_loop().create_future()
+        self.pending.put_nowait((command, date, future, time.perf_counter()))
+        return await future
+
+    async def run_batches(self):
+        """Collect pending requests into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.pending.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.pending.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.dispatch(batch)
+
+    def dispatch(self, batch):
+        """Convert the fast requests of batch and send the others to the
+        worker pool."""
+        self.batches += 1
+        slow = []
+        for item in batch:
+            command, date, future, start = item
+            result = convert_fast(command, date)
+            if result is None:
+                slow.append(item)
+            else:
+                self.finish(future, start, result)
+        if slow:
+            self.astronomical += len(slow)
+            loop = asyncio.get_running_loop()
+            results = loop.run_in_executor(
+                self.executor, convert_batch,
+                [(command, date) for command, date, _, _ in slow])
+            results.add_done_callback(
+                lambda results: self.finish_batch(slow, results))
+
+    def finish_batch(self, batch, results):
+        """Deliver the results of a batch run on the worker pool."""
+        if results.cancelled():
+            results = ["error: conversion cancelled"] * len(batch)
+        elif results.exception() is not None:
+            results = ["error: %s" % results.exception()] * len(batch)
+        else:
+            results = results.result()
+        for (_, _, future, start), result in zip(batch, results):
+            self.finish(future, start, result)
+
+    def finish(self, future, start, result):
+        """Deliver the result of one request."""
+        self.requests += 1
+        self.latencies.append(time.perf_counter() - start)
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self):
+        """Statistics line of the service."""
+        elapsed = time.perf_counter() - self.start_time
+        latencies = sorted(self.latencies)
+
+        def percentile(p):
+            if not latencies:
+                return 0
+            return 1000 * latencies[min(len(latencies) - 1, int(p * len(latencies)))]
+
+        return ("requests=%d batches=%d astronomical=%d"
+                " throughput=%.1f/s p50_latency=%.3fms p99_latency=%.3fms"
+                % (self.requests, self.batches, self.astronomical,
+                   self.requests / elapsed if elapsed else 0,
+                   percentile(0.5), percentile(0.99)))
+
+    async def handle_client(self, reader, writer):
+        """Answer the requests of one connection, in order."""
+        self.clients[writer] = asyncio.current_task()
+        responses = asyncio.Queue(maxsize=MAX_PIPELINED_REQUESTS)
+
+        async def respond():
+            connected = True
+            while True:
+                response = await responses.get()
+                if response is None:
+                    break
+                response = await response
+                if connected:
+                    try:
+                        writer.write((response + '\n').encode())
+                        await writer.drain()
+                    except ConnectionError:
+                        # Keep taking responses so that reading never waits
+                        # on a full queue.
+                        connected = False
+
+        responder = asyncio.create_task(respond())
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ConnectionError, ValueError):
+                    break
+                if not line:
+                    break
+                await responses.put(asyncio.ensure_future(
+                    self.request(line.decode(errors='replace'))))
+        finally:
+            await responses.put(None)
+            await responder
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+            del self.clients[writer]
+
+
+async def serve(path=None, host='127.0.0.1', port=0, **kwargs):
+    """Run a ConversionServer until cancelled."""
+    server = ConversionServer(**kwargs)
+    listener = await server.start(path, host, port)
+    for socket in listener.sockets:
+        print("Listening on %s" % (socket.getsockname(),))
+    try:
+        await listener.serve_forever()
+    finally:
+        await server.close()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--unix', metavar='PATH', help="listen on this Unix socket")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8733)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-delay', type=float, default=0.002,
+                        help="seconds to wait for a batch to fill")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.unix, args.host, args.port,
+                          max_batch_size=args.max_batch_size,
+                          max_delay=args.max_delay))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,50 @@
+import pytest
+
+import persiancalendar
+
+EQUINOX_START_YEAR = 1206
+EQUINOX_END_YEAR = 1498
+
+
+def test_equinox_1403():
+    """Test against the published moment of the March 2024 equinox, 03:06 UT."""
+    equinox = persiancalendar.persian_equinox(1403)
+    published = (persiancalendar.fixed_from_gregorian((2024, 3, 20))
+                 + persiancalendar.hr(3 + 6 / 60))
+    assert (abs(equinox - published) < persiancalendar.hr(1 / 60))
+
+
+def test_equinox_nowruz():
+    """Test that Nowruz is the first day whose noon is after the equinox."""
+    terms = persiancalendar.persian_solar_terms(
+        EQUINOX_START_YEAR, EQUINOX_END_YEAR)
+    for p_year in range(EQUINOX_START_YEAR, EQUINOX_END_YEAR + 1):
+        nowruz = persiancalendar.fixed_from_persian((p_year, 1, 1))
+        equinox = terms[p_year][0]
+        assert (persiancalendar.midday_in_persian_locale(nowruz - 1)
+                < equinox
+                <= persiancalendar.midday_in_persian_locale(nowruz))
+
+
+def test_solar_terms_warm_start():
+    """Test that warm-started searches match searches started from scratch."""
+    terms = persiancalendar.persian_solar_terms(
+        EQUINOX_START_YEAR, EQUINOX_END_YEAR)
+    for p_year in range(EQUINOX_START_YEAR + 1, EQUINOX_END_YEAR + 1, 17):
+        tee = terms[p_year - 1][11]
+        for month in range(1, 13):
+            tee = persiancalendar.solar_longitude_after((month - 1) * 30, tee)
+            assert (abs(terms[p_year][month - 1] - tee) < 1 / 10000)
+
+
+def test_equinox_year_zero():
+    """Test that there is no equinox for the nonexistent year zero."""
+    with pytest.raises(ValueError):
+        persiancalendar.persian_equinox(0)
+    assert (0 not in persiancalendar.persian_solar_terms(-1, 1))
+
+
+if __name__ == "__main__":
+    test_equinox_1403()
+    test_equinox_nowruz()
+    test_solar_terms_warm_start()
@@ -0,0 +1,159 @@
+import asyncio
+import socket
+
+import pytest
+
+import persiancalendar
+import persiancalendar_server
+
+
+async def exchange(reader, writer, lines):
+    """Send request lines on a connection and read back the responses."""
+    writer.write(''.join(line + '\n' for line in lines).encode())
+    await writer.drain()
+    return [(await reader.readline()).decode().strip() for _ in lines]
+
+
+def run_session(lines, clients=1, path=None):
+    """Responses to lines sent concurrently by each of clients."""
+    async def session():
+        server = persiancalendar_server.ConversionServer()
+        listener = await server.start(path=path)
+        try:
+            connections = []
+            for _ in range(clients):
+                if path is not None:
+                    connections.append(await asyncio.open_unix_connection(path))
+                else:
+                    host, port = listener.sockets[0].getsockname()[:2]
+                    connections.append(await asyncio.open_connection(host, port))
+            responses = await asyncio.gather(
+                *[exchange(reader, writer, lines) for reader, writer in connections])
+            stats = (await exchange(*connections[0], ['stats']))[0]
+            for _, writer in connections:
+                writer.close()
+                await writer.wait_closed()
+            return responses, stats, server
+        finally:
+            await server.close()
+
+    return asyncio.run(session())
+
+
+def test_server_convert():
+    """Test conversions in both directions, inside and outside the fast range."""
+    lines = ['persian 2024-03-20', 'gregorian 1403-01-01',
+             'persian 1700-03-21', 'gregorian 1079-01-01',
+             'persian 2024-02-30', 'gregorian 1402-12-30', 'gregorian 1403-12-31',
+             'hello']
+    fixed_date = persiancalendar.fixed_from_gregorian((1700, 3, 21))
+    astro_persian = persiancalendar.persian_from_fixed(fixed_date)
+    astro_gregorian = persiancalendar.gregorian_from_fixed(
+        persiancalendar.fixed_from_persian((1079, 1, 1)))
+    (responses,), stats, server = run_session(lines)
+    assert (responses[:4] == ['1403-01-01', '2024-03-20',
+                              '%d-%02d-%02d' % astro_persian,
+                              '%d-%02d-%02d' % astro_gregorian])
+    assert (all(response.startswith('error:') for response in responses[4:]))
+    assert (server.astronomical == 2)
+    assert (stats.startswith('requests=5 '))
+
+
+def test_server_batching():
+    """Test that concurrent requests from several clients are batched."""
+    lines = ['persian 2024-%02d-01' % month for month in range(1, 13)]
+    responses, stats, server = run_session(lines, clients=8)
+    expected = ['1402-10-11', '1402-11-12', '1402-12-11', '1403-01-13',
+                '1403-02-12', '1403-03-12', '1403-04-11', '1403-05-11',
+                '1403-06-11', '1403-07-10', '1403-08-11', '1403-09-11']
+    assert (responses == [expected] * 8)
+    assert (server.requests == 96)
+    assert (server.batches < server.requests)
+
+
+def test_server_convert_error():
+    """Test that a request that fails to convert does not fail its batch."""
+    lines = ['persian 1700-03-21', 'gregorian 1%s-01-01' % ('0' * 310),
+             'gregorian 1079-01-01']
+    fixed_date = persiancalendar.fixed_from_gregorian((1700, 3, 21))
+    astro_persian = persiancalendar.persian_from_fixed(fixed_date)
+    astro_gregorian = persiancalendar.gregorian_from_fixed(
+        persiancalendar.fixed_from_persian((1079, 1, 1)))
+    (responses,), stats, server = run_session(lines)
+    assert (responses[0] == '%d-%02d-%02d' % astro_persian)
+    assert (responses[1].startswith('error:'))
+    assert (responses[2] == '%d-%02d-%02d' % astro_gregorian)
+    assert (server.batches == 1)
+
+
+def test_server_year_zero():
+    """Test that year zero is only rejected for Persian dates."""
+    fixed_date = persiancalendar.fixed_from_gregorian((0, 3, 1))
+    astro_persian = persiancalendar.persian_from_fixed(fixed_date)
+    (responses,), stats, server = run_session(['persian 0-03-01', 'gregorian 0-01-01'])
+    assert (responses[0] == '%d-%02d-%02d' % astro_persian)
+    assert (responses[1].startswith('error:'))
+
+
+def test_convert_batch():
+    """Test that batched astronomical conversions match the scalar functions."""
+    requests = []
+    for p_year in (-2, -1, 1, 2, 1078, 1079):
+        nowruz = persiancalendar.fixed_from_persian((p_year, 1, 1))
+        for date in (nowruz - 1, nowruz, nowruz + 186, nowruz + 187):
+            requests.append(('persian', persiancalendar.gregorian_from_fixed(date)))
+        for month, day in ((1, 1), (6, 31), (7, 1), (12, 29)):
+            requests.append(('gregorian', (p_year, month, day)))
+    expected = []
+    for command, date in requests:
+        if command == 'persian':
+            result = persiancalendar.persian_from_fixed(
+                persiancalendar.fixed_from_gregorian(date))
+        else:
+            result = persiancalendar.gregorian_from_fixed(
+                persiancalendar.fixed_from_persian(date))
+        expected.append('%d-%02d-%02d' % result)
+    assert (persiancalendar_server.convert_batch(requests) == expected)
+
+
+def test_server_close_with_client():
+    """Test that the server shuts down while a client is still connected."""
+    async def session():
+        server = persiancalendar_server.ConversionServer()
+        listener = await server.start()
+        host, port = listener.sockets[0].getsockname()[:2]
+        reader, writer = await asyncio.open_connection(host, port)
+        responses = await exchange(reader, writer, ['gregorian 1403-01-01'])
+        await asyncio.wait_for(server.close(), 5)
+        eof = await asyncio.wait_for(reader.read(), 5)
+        writer.close()
+        return responses, eof
+
+    responses, eof = asyncio.run(session())
+    assert (responses == ['2024-03-20'])
+    assert (eof == b'')
+
+
+def test_server_pipelining(monkeypatch):
+    """Test that a client may pipeline more requests than are queued at once."""
+    monkeypatch.setattr(persiancalendar_server, 'MAX_PIPELINED_REQUESTS', 4)
+    lines = ['persian 2024-03-20'] * 50
+    (responses,), stats, server = run_session(lines)
+    assert (responses == ['1403-01-01'] * 50)
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="no Unix sockets")
+def test_server_unix_socket(tmp_path):
+    """Test the server on a Unix socket."""
+    path = str(tmp_path / 'persiancalendar.sock')
+    (responses,), stats, server = run_session(['gregorian 1403-01-01'], path=path)
+    assert (responses == ['2024-03-20'])
+
+
+if __name__ == "__main__":
+    test_server_convert()
+    test_server_convert_error()
+    test_server_year_zero()
+    test_server_batching()
+    test_convert_batch()
+    test_server_close_with_client()
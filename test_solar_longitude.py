@@ -0,0 +1,21 @@
+import persiancalendar
+
+ESTIMATE_START_YEAR = 1178
+ESTIMATE_END_YEAR = 3000
+
+
+def test_solar_longitude_estimate():
+    """Test that solar_longitude_estimate is within its documented error bound."""
+    start = persiancalendar.fixed_from_persian((ESTIMATE_START_YEAR, 1, 1))
+    end = persiancalendar.fixed_from_persian((ESTIMATE_END_YEAR + 1, 1, 1))
+
+    for tee in range(start, end, 13):
+        tee += 0.37
+        estimate = persiancalendar.solar_longitude_estimate(tee)
+        exact = persiancalendar.solar_longitude(tee)
+        difference = persiancalendar.mod3(estimate - exact, -180, 180)
+        assert (abs(difference) < persiancalendar.SOLAR_LONGITUDE_ESTIMATE_ERROR)
+
+
+if __name__ == "__main__":
+    test_solar_longitude_estimate()